@@ -1,14 +1,16 @@
+import asyncio
 import logging
-import sqlite3
 import os
-from datetime import datetime
 
+import aiosqlite
 from telegram import (
     Update, InlineKeyboardButton, InlineKeyboardMarkup,
-    ReplyKeyboardRemove, ParseMode
+    ReplyKeyboardRemove
 )
+from telegram.constants import MessageLimit, ParseMode
+from telegram.error import TelegramError
 from telegram.ext import (
-    Updater, CommandHandler, MessageHandler, Filters,
+    AIORateLimiter, Application, CommandHandler, MessageHandler, filters,
     CallbackQueryHandler, ConversationHandler, CallbackContext
 )
 from dotenv import load_dotenv
@@ -29,262 +31,371 @@ BOT_TOKEN = os.getenv('BOT_TOKEN')
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN environment variable is not set!")
 
+# Public HTTPS base URL for webhook mode (e.g. https://my-app.herokuapp.com).
+# Falls back to long polling when not set.
+PUBLIC_URL = os.getenv('PUBLIC_URL')
+PORT = int(os.getenv('PORT', 8443))
+
 # Database setup
 DB_NAME = 'channels.db'
 
-def init_db():
-    """Initialize database"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
+# Queries run by the handlers, defined once so every caller uses the same
+# statement
+SQL_SELECT_CHANNELS = "SELECT channel_id, channel_name FROM channels ORDER BY id"
+SQL_INSERT_CHANNEL = (
+    "INSERT OR IGNORE INTO channels (channel_id, channel_name, added_date) "
+    "VALUES (?, ?, CAST(strftime('%s', 'now') AS INTEGER))"
+)
+SQL_DELETE_CHANNEL = "DELETE FROM channels WHERE channel_id = ?"
+
+# Single long-lived aiosqlite connection shared by all handlers, opened in
+# init_db. Queries run on aiosqlite's worker thread so they don't block the
+# event loop, and the page cache stays warm between handlers.
+DB_CONN = None
+
+# Serializes writes and cache loads on the shared connection
+DB_LOCK = asyncio.Lock()
+
+# In-memory copy of the channel list, reset whenever channels change
+CHANNELS_CACHE = None
+
+async def init_db(application: Application):
+    """Open the database connection and initialize tables"""
+    global DB_CONN
+    DB_CONN = await aiosqlite.connect(DB_NAME, isolation_level=None)
+    
+    # WAL lets readers run alongside a writer. synchronous=NORMAL only
+    # skips the fsync that guards against OS crashes / power loss; a
+    # crash of the bot process itself cannot lose committed data.
+    await DB_CONN.execute("PRAGMA journal_mode=WAL")
+    await DB_CONN.execute("PRAGMA synchronous=NORMAL")
+    await DB_CONN.execute("PRAGMA temp_store=MEMORY")
+    await DB_CONN.execute("PRAGMA cache_size=-8000")
+    # Wait for other writers (e.g. a sqlite3 shell) instead of failing
+    await DB_CONN.execute("PRAGMA busy_timeout=30000")
+    await DB_CONN.execute('''
         CREATE TABLE IF NOT EXISTS channels (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             channel_id TEXT UNIQUE,
             channel_name TEXT,
-            added_date TIMESTAMP
+            added_date INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
         )
     ''')
-    conn.commit()
-    conn.close()
+    # Remove the old covering index: it reordered listings by channel_id
+    # and only duplicated the UNIQUE index on a tiny table
+    await DB_CONN.execute("DROP INDEX IF EXISTS idx_channels_cover")
+
+async def close_db(application: Application):
+    """Close the database connection"""
+    await DB_CONN.close()
+
+async def get_channels() -> list:
+    """Get all channels, loading them from the database on a cache miss"""
+    global CHANNELS_CACHE
+    async with DB_LOCK:
+        if CHANNELS_CACHE is None:
+            CHANNELS_CACHE = await DB_CONN.execute_fetchall(SQL_SELECT_CHANNELS)
+        return CHANNELS_CACHE
+
+# Max number of Bot API calls in flight at once when fanning out over
+# channels (/post sends, /add checks). This only bounds concurrency; the
+# request rate is limited by the application's AIORateLimiter.
+API_CONCURRENCY = 16
+API_SEMAPHORE = asyncio.Semaphore(API_CONCURRENCY)
+
+# Reply to /start
+WELCOME_TEXT = (
+    "🤖 **Channel Manager Bot**\n\n"
+    "**Available Commands:**\n"
+    "/add <channel_id> [channel_id ...] - Add channels (Admin only)\n"
+    "/list - List all channels with remove option\n"
+    "/post - Create and post to channels\n\n"
+    "*Note:* Bot must be admin in the channels."
+)
+
+# Post text is the same for every link, only the buttons change
+POST_TEXT = "**𝗪𝗵𝗮𝘁 𝗟𝗮𝗻𝗴𝘂𝗮𝗴𝗲 𝗗𝗼 𝘆𝗼𝘂 𝗪𝗮𝘁𝗰𝗵 𝗠𝗼𝘃𝗶𝗲𝘀? ?** 😍"
+
+# Telegram rejects very large inline keyboards, so channel lists are paged
+PAGE_SIZE = 50
 
 # Conversation states
 LINK, CHANNEL_SELECTION = range(2)
 
 # Admin list - set your admin user IDs here
-ADMIN_IDS = [int(id.strip()) for id in os.getenv('ADMIN_IDS', '8242413007').split(',') if id.strip()]
+ADMIN_IDS = frozenset(int(id.strip()) for id in os.getenv('ADMIN_IDS', '8242413007').split(',') if id.strip())
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin"""
     return user_id in ADMIN_IDS
 
-def start(update: Update, context: CallbackContext):
+def normalize_channel_id(channel_id: str) -> str:
+    """Canonical form of a channel ID, e.g. '-0100123' -> '-100123'"""
+    try:
+        return str(int(channel_id))
+    except ValueError:
+        # @username of a public channel
+        return channel_id
+
+def split_lines(lines: list, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list:
+    """Join lines into as few messages as fit Telegram's text length limit"""
+    messages = []
+    current = ""
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        # Telegram counts the limit in UTF-16 code units
+        if current and len(candidate.encode('utf-16-le')) // 2 > limit:
+            messages.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+def page_nav_row(total: int, offset: int, prefix: str) -> list:
+    """Create Prev/Next buttons for a paged channel keyboard"""
+    row = []
+    if offset > 0:
+        row.append(InlineKeyboardButton(
+            "⬅️ Prev", callback_data=f"{prefix}{max(offset - PAGE_SIZE, 0)}"
+        ))
+    if offset + PAGE_SIZE < total:
+        row.append(InlineKeyboardButton(
+            "Next ➡️", callback_data=f"{prefix}{offset + PAGE_SIZE}"
+        ))
+    return row
+
+def create_remove_markup(channels: list, offset: int = 0) -> InlineKeyboardMarkup:
+    """Create one page of the /list keyboard"""
+    keyboard = [
+        [InlineKeyboardButton(f"❌ {channel_name}", callback_data=f"remove_{channel_id}")]
+        for channel_id, channel_name in channels[offset:offset + PAGE_SIZE]
+    ]
+    nav_row = page_nav_row(len(channels), offset, "list_")
+    if nav_row:
+        keyboard.append(nav_row)
+    return InlineKeyboardMarkup(keyboard)
+
+def create_selection_markup(channels: list, offset: int = 0) -> InlineKeyboardMarkup:
+    """Create one page of the /post channel selection keyboard"""
+    keyboard = [[InlineKeyboardButton("🌐 Post to ALL Channels", callback_data="all")]]
+    keyboard += [
+        [InlineKeyboardButton(f"📢 {channel_name}", callback_data=f"channel_{channel_id}")]
+        for channel_id, channel_name in channels[offset:offset + PAGE_SIZE]
+    ]
+    nav_row = page_nav_row(len(channels), offset, "page_")
+    if nav_row:
+        keyboard.append(nav_row)
+    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel")])
+    return InlineKeyboardMarkup(keyboard)
+
+async def start(update: Update, context: CallbackContext):
     """Send welcome message"""
-    welcome_text = (
-        "🤖 **Channel Manager Bot**\n\n"
-        "**Available Commands:**\n"
-        "/add <channel_id> - Add a channel (Admin only)\n"
-        "/list - List all channels with remove option\n"
-        "/post - Create and post to channels\n\n"
-        "*Note:* Bot must be admin in the channels."
-    )
-    
-    update.message.reply_text(
-        welcome_text,
+    await update.message.reply_text(
+        WELCOME_TEXT,
         parse_mode=ParseMode.MARKDOWN
     )
 
-def add_channel(update: Update, context: CallbackContext):
-    """Add a channel to database"""
+async def verify_channel(context: CallbackContext, channel_id: str):
+    """Get channel name if bot is admin in the channel, else None"""
+    # Both lookups are independent, so send them concurrently. This also
+    # sends get_chat for channels the admin check then rejects.
+    async with API_SEMAPHORE:
+        chat_member, chat = await asyncio.gather(
+            context.bot.get_chat_member(channel_id, context.bot.id),
+            context.bot.get_chat(channel_id)
+        )
+    if chat_member.status not in ['administrator', 'creator']:
+        return None
+    return chat.title
+
+async def add_channel(update: Update, context: CallbackContext):
+    """Add one or more channels to database"""
     user_id = update.effective_user.id
     
     # Check if user is admin
     if not is_admin(user_id):
-        update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text("❌ You are not authorized to use this command.")
         return
     
     # Check if channel ID is provided
     if not context.args:
-        update.message.reply_text("Usage: /add <channel_id>")
+        await update.message.reply_text("Usage: /add <channel_id> [channel_id ...]")
         return
     
-    channel_id = context.args[0]
+    results = []
+    failed = False
+    verified = []
     
-    try:
-        # Check if bot is admin in the channel
-        chat_member = context.bot.get_chat_member(channel_id, context.bot.id)
-        if chat_member.status not in ['administrator', 'creator']:
-            update.message.reply_text("❌ I must be an admin in that channel!")
-            return
-        
-        # Get channel name
-        chat = context.bot.get_chat(channel_id)
-        channel_name = chat.title
-        
-        # Add to database
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
+    channel_ids = [normalize_channel_id(channel_id) for channel_id in context.args]
+    
+    # Check all channels with Telegram concurrently
+    checks = await asyncio.gather(
+        *(verify_channel(context, channel_id) for channel_id in channel_ids),
+        return_exceptions=True
+    )
+    
+    for channel_id, channel_name in zip(channel_ids, checks):
+        if isinstance(channel_name, TelegramError):
+            logger.error(f"Error adding channel {channel_id}: {channel_name}")
+            results.append(f"❌ Error adding channel {channel_id}.")
+            failed = True
+        elif isinstance(channel_name, Exception):
+            # Not a Telegram API failure, let the error handler log it
+            raise channel_name
+        elif channel_name is None:
+            results.append(f"❌ I must be an admin in {channel_id}!")
+        else:
+            verified.append((channel_id, channel_name))
+    
+    # Add all verified channels to database in one transaction
+    global CHANNELS_CACHE
+    async with DB_LOCK:
+        await DB_CONN.execute("BEGIN")
         try:
-            cursor.execute(
-                "INSERT INTO channels (channel_id, channel_name, added_date) VALUES (?, ?, ?)",
-                (channel_id, channel_name, datetime.now())
-            )
-            conn.commit()
-            
-            update.message.reply_text(
-                f"✅ Channel '{channel_name}' added successfully!"
-            )
-        except sqlite3.IntegrityError:
-            update.message.reply_text("⚠️ This channel is already in the database!")
-        
-        conn.close()
-        
-    except Exception as e:
-        logger.error(f"Error adding channel: {e}")
-        update.message.reply_text(
-            "❌ Error adding channel. Make sure:\n"
+            for channel_id, channel_name in verified:
+                cursor = await DB_CONN.execute(SQL_INSERT_CHANNEL, (channel_id, channel_name))
+                if cursor.rowcount:
+                    results.append(f"✅ Channel '{channel_name}' added successfully!")
+                else:
+                    results.append(f"⚠️ Channel '{channel_name}' is already in the database!")
+            await DB_CONN.commit()
+        except Exception:
+            await DB_CONN.rollback()
+            raise
+        finally:
+            CHANNELS_CACHE = None
+    
+    if failed:
+        results.append(
+            "\nMake sure:\n"
             "1. Channel ID is correct (use @username for public or -100ID for private)\n"
             "2. I'm added to that channel as admin\n"
             "3. For private channels, use numeric ID starting with -100"
         )
+    
+    for text in split_lines(results):
+        await update.message.reply_text(text)
 
-def list_channels(update: Update, context: CallbackContext):
+async def list_channels(update: Update, context: CallbackContext):
     """List all channels with inline buttons to remove"""
     # Check if user is admin
     if not is_admin(update.effective_user.id):
-        update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text("❌ You are not authorized to use this command.")
         return
     
-    # Get channels from database
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT channel_id, channel_name FROM channels")
-    channels = cursor.fetchall()
-    conn.close()
+    # Get channels (cached until channels are added or removed)
+    channels = await get_channels()
     
     if not channels:
-        update.message.reply_text("📭 No channels in database. Use /add to add channels.")
+        await update.message.reply_text("📭 No channels in database. Use /add to add channels.")
         return
     
-    # Create inline keyboard
-    keyboard = []
-    for channel_id, channel_name in channels:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=f"❌ {channel_name}",
-                callback_data=f"remove_{channel_id}"
-            )
-        ])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    update.message.reply_text(
+    await update.message.reply_text(
         "📋 **Channel List**\nClick on a channel to remove it:",
         parse_mode=ParseMode.MARKDOWN,
-        reply_markup=reply_markup
+        reply_markup=create_remove_markup(channels)
     )
 
-def button_callback(update: Update, context: CallbackContext):
+async def list_page_callback(update: Update, context: CallbackContext):
+    """Show another page of the /list keyboard"""
+    query = update.callback_query
+    await query.answer()
+    
+    # Check if user is admin
+    if not is_admin(query.from_user.id):
+        await query.edit_message_text("❌ You are not authorized to use this command.")
+        return
+    
+    offset = int(query.data.removeprefix("list_"))
+    
+    channels = await get_channels()
+    
+    if not channels:
+        await query.edit_message_text("📭 No channels in database. Use /add to add channels.")
+        return
+    
+    # Clamp in case channels were removed since the page was shown
+    offset = min(offset, (len(channels) - 1) // PAGE_SIZE * PAGE_SIZE)
+    await query.edit_message_reply_markup(reply_markup=create_remove_markup(channels, offset))
+
+async def button_callback(update: Update, context: CallbackContext):
     """Handle inline button callbacks for removing channels"""
     query = update.callback_query
-    query.answer()
+    await query.answer()
     
     # Check if user is admin
     if not is_admin(query.from_user.id):
-        query.edit_message_text("❌ You are not authorized to remove channels.")
+        await query.edit_message_text("❌ You are not authorized to remove channels.")
         return
     
     # Extract channel_id from callback data
-    channel_id = query.data.replace("remove_", "")
+    channel_id = query.data.removeprefix("remove_")
     
-    # Remove from database
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM channels WHERE channel_id = ?", (channel_id,))
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
+    # Get channel name for the message from the stored list, so no
+    # Telegram round-trip is needed
+    channel_name = dict(await get_channels()).get(channel_id, channel_id)
+    
+    # Remove from database, holding the lock only for the DB work
+    global CHANNELS_CACHE
+    async with DB_LOCK:
+        cursor = await DB_CONN.execute(SQL_DELETE_CHANNEL, (channel_id,))
+        deleted = cursor.rowcount
+        if deleted:
+            CHANNELS_CACHE = None
     
     if deleted:
-        # Get channel name for the message
-        try:
-            chat = context.bot.get_chat(channel_id)
-            channel_name = chat.title
-        except:
-            channel_name = channel_id
-        
         # Update message
-        query.edit_message_text(
+        await query.edit_message_text(
             f"✅ Channel '{channel_name}' removed successfully!\n\nUse /list to see remaining channels."
         )
     else:
-        query.edit_message_text("❌ Channel not found in database.")
+        await query.edit_message_text("❌ Channel not found in database.")
 
-def post_start(update: Update, context: CallbackContext):
+async def post_start(update: Update, context: CallbackContext):
     """Start the post creation process"""
     # Check if user is admin
     if not is_admin(update.effective_user.id):
-        update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text("❌ You are not authorized to use this command.")
         return ConversationHandler.END
     
-    update.message.reply_text(
+    await update.message.reply_text(
         "📝 Please send me the link for the post:",
         reply_markup=ReplyKeyboardRemove()
     )
     
     return LINK
 
-def get_link(update: Update, context: CallbackContext):
+async def get_link(update: Update, context: CallbackContext):
     """Get link and show channel selection"""
     link = update.message.text
     
     # Validate link (basic validation)
     if not link.startswith(('http://', 'https://')):
-        update.message.reply_text("❌ Please provide a valid HTTP/HTTPS link.")
+        await update.message.reply_text("❌ Please provide a valid HTTP/HTTPS link.")
         return LINK
     
     # Store link in context
     context.user_data['post_link'] = link
     
-    # Get channels from database
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT channel_id, channel_name FROM channels")
-    channels = cursor.fetchall()
-    conn.close()
+    # Get channels (cached until channels are added or removed)
+    channels = await get_channels()
     
     if not channels:
-        update.message.reply_text("❌ No channels in database. Add channels first using /add")
+        await update.message.reply_text("❌ No channels in database. Add channels first using /add")
         return ConversationHandler.END
     
-    # Create inline keyboard for channel selection
-    keyboard = []
-    
-    # Add "All Channels" button
-    keyboard.append([
-        InlineKeyboardButton(
-            text="🌐 Post to ALL Channels",
-            callback_data="all"
-        )
-    ])
-    
-    # Add individual channel buttons
-    for channel_id, channel_name in channels:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=f"📢 {channel_name}",
-                callback_data=f"channel_{channel_id}"
-            )
-        ])
-    
-    # Add cancel button
-    keyboard.append([
-        InlineKeyboardButton(
-            text="❌ Cancel",
-            callback_data="cancel"
-        )
-    ])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     # Show post preview
-    post_text = create_post_text(link)
-    update.message.reply_text(
-        f"📄 **Post Preview:**\n\n{post_text}\n\n"
+    await update.message.reply_text(
+        f"📄 **Post Preview:**\n\n{POST_TEXT}\n\n"
         "Select where to post:",
         parse_mode=ParseMode.MARKDOWN,
-        reply_markup=reply_markup
+        reply_markup=create_selection_markup(channels)
     )
     
     return CHANNEL_SELECTION
 
-def create_post_text(link: str) -> str:
-    """Create the post text with proper formatting"""
-    post_text = (
-        "**𝗪𝗵𝗮𝘁 𝗟𝗮𝗻𝗴𝘂𝗮𝗴𝗲 𝗗𝗼 𝘆𝗼𝘂 𝗪𝗮𝘁𝗰𝗵 𝗠𝗼𝘃𝗶𝗲𝘀? ?** 😍"
-    )
-    return post_text
-
 def create_post_markup(link: str) -> InlineKeyboardMarkup:
     """Create inline keyboard for the post"""
     keyboard = [
@@ -300,129 +411,159 @@ def create_post_markup(link: str) -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def channel_selection(update: Update, context: CallbackContext):
+async def send_post(context: CallbackContext, channel_id: str, post_markup: InlineKeyboardMarkup):
+    """Send the post to one channel"""
+    async with API_SEMAPHORE:
+        return await context.bot.send_message(
+            chat_id=channel_id,
+            text=POST_TEXT,
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=post_markup,
+            # Link lives in the buttons, skip Telegram's preview scrape
+            disable_web_page_preview=True
+        )
+
+async def channel_selection(update: Update, context: CallbackContext):
     """Handle channel selection for posting"""
     query = update.callback_query
-    query.answer()
+    await query.answer()
     
     if query.data == "cancel":
-        query.edit_message_text("❌ Post cancelled.")
+        await query.edit_message_text("❌ Post cancelled.")
         return ConversationHandler.END
     
+    if query.data.startswith("page_"):
+        # Switch keyboard page, stay in channel selection
+        offset = int(query.data.removeprefix("page_"))
+        channels = await get_channels()
+        # Clamp in case channels were removed since the page was shown
+        offset = max(min(offset, (len(channels) - 1) // PAGE_SIZE * PAGE_SIZE), 0)
+        await query.edit_message_reply_markup(reply_markup=create_selection_markup(channels, offset))
+        return CHANNEL_SELECTION
+    
     # Get the link from context
     link = context.user_data.get('post_link')
     if not link:
-        query.edit_message_text("❌ Error: Link not found.")
+        await query.edit_message_text("❌ Error: Link not found.")
         return ConversationHandler.END
     
-    # Prepare post
-    post_text = create_post_text(link)
+    # Prepare post once, reused for every channel
     post_markup = create_post_markup(link)
     
-    # Get channels
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT channel_id, channel_name FROM channels")
-    channels = cursor.fetchall()
-    conn.close()
+    # Current channels, so ones removed while the picker was open are skipped
+    channels = await get_channels()
     
     success_count = 0
     failed_channels = []
     
     if query.data == "all":
-        # Post to all channels
-        for channel_id, channel_name in channels:
-            try:
-                context.bot.send_message(
-                    chat_id=channel_id,
-                    text=post_text,
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=post_markup
-                )
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Error posting to {channel_name}: {e}")
+        # Post to all channels concurrently
+        results = await asyncio.gather(
+            *(send_post(context, channel_id, post_markup) for channel_id, _ in channels),
+            return_exceptions=True
+        )
+        
+        for (channel_id, channel_name), result in zip(channels, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error posting to {channel_name}: {result}")
                 failed_channels.append(channel_name)
+            else:
+                success_count += 1
         
         # Send summary
-        summary = f"✅ Posted to {success_count} channel(s)"
+        summary = [f"✅ Posted to {success_count} channel(s)"]
         if failed_channels:
-            summary += f"\n❌ Failed: {', '.join(failed_channels)}"
+            summary.append(f"❌ Failed: {', '.join(failed_channels)}")
         
-        query.edit_message_text(summary)
+        await query.edit_message_text("\n".join(summary))
     
     else:
         # Post to single channel
-        channel_id = query.data.replace("channel_", "")
+        channel_id = query.data.removeprefix("channel_")
         
         # Find channel name
-        channel_name = ""
+        channel_name = None
         for cid, cname in channels:
             if cid == channel_id:
                 channel_name = cname
                 break
         
+        if channel_name is None:
+            await query.edit_message_text("❌ Channel not found.")
+            return ConversationHandler.END
+        
         try:
-            context.bot.send_message(
-                chat_id=channel_id,
-                text=post_text,
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=post_markup
-            )
-            query.edit_message_text(f"✅ Posted to {channel_name} successfully!")
+            await send_post(context, channel_id, post_markup)
+            await query.edit_message_text(f"✅ Posted to {channel_name} successfully!")
         except Exception as e:
             logger.error(f"Error posting to {channel_name}: {e}")
-            query.edit_message_text(f"❌ Failed to post to {channel_name}")
+            await query.edit_message_text(f"❌ Failed to post to {channel_name}")
     
     return ConversationHandler.END
 
-def cancel_post(update: Update, context: CallbackContext):
+async def cancel_post(update: Update, context: CallbackContext):
     """Cancel the post creation process"""
-    update.message.reply_text(
+    await update.message.reply_text(
         "❌ Post creation cancelled.",
         reply_markup=ReplyKeyboardRemove()
     )
     return ConversationHandler.END
 
-def error_handler(update: Update, context: CallbackContext):
+async def error_handler(update: Update, context: CallbackContext):
     """Log errors"""
     logger.error(msg="Exception occurred:", exc_info=context.error)
 
 def main():
     """Main function to start the bot"""
-    # Initialize database
-    init_db()
-    
-    # Create updater and dispatcher
-    updater = Updater(BOT_TOKEN, use_context=True)
-    dispatcher = updater.dispatcher
+    # Create application, database is opened/closed with it
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        # Let bursts wait for a free connection instead of failing after 1s
+        .pool_timeout(30)
+        # Keep to Telegram's 30 msg/s limit and retry sends answered with
+        # RetryAfter instead of reporting them as failed
+        .rate_limiter(AIORateLimiter(max_retries=3))
+        .post_init(init_db)
+        .post_shutdown(close_db)
+        .build()
+    )
     
     # Register handlers
-    dispatcher.add_handler(CommandHandler("start", start))
-    dispatcher.add_handler(CommandHandler("add", add_channel))
-    dispatcher.add_handler(CommandHandler("list", list_channels))
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("add", add_channel))
+    application.add_handler(CommandHandler("list", list_channels))
     
     # Conversation handler for /post command
     conv_handler = ConversationHandler(
         entry_points=[CommandHandler('post', post_start)],
         states={
-            LINK: [MessageHandler(Filters.text & ~Filters.command, get_link)],
-            CHANNEL_SELECTION: [CallbackQueryHandler(channel_selection)]
+            LINK: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_link)],
+            CHANNEL_SELECTION: [CallbackQueryHandler(channel_selection, pattern=r'^(all|cancel|channel_|page_)')]
         },
         fallbacks=[CommandHandler('cancel', cancel_post)]
     )
-    dispatcher.add_handler(conv_handler)
+    application.add_handler(conv_handler)
     
     # Callback query handler for removing channels
-    dispatcher.add_handler(CallbackQueryHandler(button_callback, pattern='^remove_'))
+    application.add_handler(CallbackQueryHandler(button_callback, pattern='^remove_'))
+    application.add_handler(CallbackQueryHandler(list_page_callback, pattern='^list_'))
     
     # Error handler
-    dispatcher.add_error_handler(error_handler)
+    application.add_error_handler(error_handler)
     
     # Start the bot
     print("🤖 Bot is starting...")
-    updater.start_polling()
-    updater.idle()
+    if PUBLIC_URL:
+        # Telegram pushes updates to us, no idle getUpdates traffic
+        application.run_webhook(
+            listen='0.0.0.0',
+            port=PORT,
+            url_path=BOT_TOKEN,
+            webhook_url=f"{PUBLIC_URL.rstrip('/')}/{BOT_TOKEN}"
+        )
+    else:
+        application.run_polling()
 
 if __name__ == '__main__':
     main()